@@ -1,9 +1,13 @@
 import csv
 import datetime as dt
+import json
+import os
+import time
 import sys
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 from unittest import mock
+from urllib.parse import parse_qs
 
 import pytest
 
@@ -11,12 +15,21 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from tournament_exporter import ChallongeExporter, load_api_key
+from tournament_exporter import (
+    ChallongeExporter,
+    _RateLimiter,
+    _read_env_all,
+    load_api_key,
+    parse_args,
+)
 
 
-def _make_response(payload: Any) -> mock.Mock:
+def _make_response(payload: Any, status_code: int = 200) -> mock.Mock:
     response = mock.Mock()
+    response.status_code = status_code
+    response.headers = {}
     response.json.return_value = payload
+    response.content = json.dumps(payload).encode("utf-8")
     response.raise_for_status.return_value = None
     return response
 
@@ -67,18 +80,18 @@ def test_fetch_tournaments_filters_by_year_and_paginates(monkeypatch: pytest.Mon
         2: _make_response(page_two_payload),
     }
 
-    def fake_get(url: str, params: Dict[str, Any], timeout: int) -> mock.Mock:
+    def fake_get(url: str, params: str, timeout: int) -> mock.Mock:
         assert url.startswith("https://api.challonge.com/v2/communities/123/tournaments")
-        assert params["api_key"] == "secret"
-        page_number = params.get("page", 1)
+        query = parse_qs(params)
+        assert query["api_key"] == ["secret"]
+        page_number = int(query["page"][0])
         assert page_number in calls
         return calls[page_number]
 
-    monkeypatch.setattr("requests.get", fake_get)
-
     exporter = ChallongeExporter(
-        api_key="secret", community="fabco", community_id="123", year=2024
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
     )
+    monkeypatch.setattr(exporter._session, "get", fake_get)
     tournaments = exporter.fetch_tournaments()
 
     assert len(tournaments) == 2
@@ -88,6 +101,193 @@ def test_fetch_tournaments_filters_by_year_and_paginates(monkeypatch: pytest.Mon
     assert tournaments[1]["participants_count"] == 8
 
 
+def test_fetch_tournaments_follows_next_links_without_total_pages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pages = {
+        1: {
+            "data": [{"id": "1", "attributes": {"started_at": "2024-01-05T10:00:00Z"}}],
+            "links": {"next": "https://api.challonge.com/v2/communities/123/tournaments?page=2"},
+        },
+        2: {
+            "data": [{"id": "2", "attributes": {"started_at": "2024-02-05T10:00:00Z"}}],
+            "links": {},
+        },
+    }
+    requested = []
+
+    def fake_get(url: str, params: str, timeout: int) -> mock.Mock:
+        page_number = int(parse_qs(params)["page"][0])
+        requested.append(page_number)
+        return _make_response(pages[page_number])
+
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
+    )
+    monkeypatch.setattr(exporter._session, "get", fake_get)
+    tournaments = exporter.fetch_tournaments()
+
+    assert requested == [1, 2]
+    assert [tournament["id"] for tournament in tournaments] == ["1", "2"]
+
+
+def test_iter_tournaments_stops_fetching_when_consumer_fails(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    total_pages = 40
+    fetched = []
+
+    def fake_get(url: str, params: str, timeout: int) -> mock.Mock:
+        page_number = int(parse_qs(params)["page"][0])
+        fetched.append(page_number)
+        time.sleep(0.05)
+        return _make_response(
+            {
+                "data": [
+                    {"id": str(page_number), "attributes": {"started_at": "2024-01-05T10:00:00Z"}}
+                ],
+                "meta": {"current_page": page_number, "total_pages": total_pages},
+            }
+        )
+
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
+    )
+    monkeypatch.setattr(exporter._session, "get", fake_get)
+
+    def consume() -> None:
+        for index, _ in enumerate(exporter.iter_tournaments()):
+            if index == 1:
+                raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        consume()
+
+    assert len(fetched) < 10
+
+
+def test_fetch_tournaments_retries_server_errors_using_retry_after(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    unavailable = _make_response({}, status_code=503)
+    unavailable.headers = {"Retry-After": "2"}
+    ok = _make_response(
+        {"data": [{"id": "1", "attributes": {"started_at": "2024-01-05T10:00:00Z"}}]}
+    )
+    responses = [unavailable, ok]
+    sleeps = []
+
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
+    )
+    monkeypatch.setattr(exporter._session, "get", lambda *_, **__: responses.pop(0))
+    monkeypatch.setattr("time.sleep", sleeps.append)
+
+    tournaments = exporter.fetch_tournaments()
+
+    assert sleeps == [2.0]
+    assert [tournament["id"] for tournament in tournaments] == ["1"]
+
+
+def test_fetch_tournaments_reads_nested_v2_timestamps(monkeypatch: pytest.MonkeyPatch) -> None:
+    payload = {
+        "data": [
+            {
+                "id": "17097604",
+                "attributes": {
+                    "name": "Power Play",
+                    "timestamps": {
+                        "created_at": "2024-11-13T23:25:38.847Z",
+                        "started_at": "2024-11-13T23:35:10.877Z",
+                        "completed_at": "2024-11-14T01:18:44.579Z",
+                    },
+                },
+            },
+            {
+                "id": "2",
+                "attributes": {"timestamps": {"created_at": "2023-05-01T10:00:00.000Z"}},
+            },
+        ]
+    }
+
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
+    )
+    monkeypatch.setattr(exporter._session, "get", lambda *_, **__: _make_response(payload))
+
+    tournaments = exporter.fetch_tournaments()
+
+    assert [tournament["id"] for tournament in tournaments] == ["17097604"]
+    assert tournaments[0]["completed_at"] == "2024-11-14T01:18:44.579Z"
+
+
+def test_fetch_tournaments_keeps_pages_with_nested_empty_data(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "data": [
+            {
+                "id": "1",
+                "relationships": {"series": {"data": []}},
+                "attributes": {"started_at": "2024-01-05T10:00:00Z"},
+            }
+        ]
+    }
+    response = _make_response(payload)
+    response.content = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    assert b'"data":[]' in response.content[:64]
+
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024, rate_limit=None
+    )
+    monkeypatch.setattr(exporter._session, "get", lambda *_, **__: response)
+
+    assert [tournament["id"] for tournament in exporter.fetch_tournaments()] == ["1"]
+
+
+def test_rate_limiter_spaces_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr("time.monotonic", lambda: clock[0])
+    monkeypatch.setattr("time.sleep", fake_sleep)
+
+    limiter = _RateLimiter(rate=4)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert sleeps == [0.25, 0.25]
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [["--max-concurrency", "0"], ["--max-concurrency", "-1"], ["--rate-limit-rps", "-2"]],
+)
+def test_parse_args_rejects_invalid_concurrency_flags(
+    flags: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["tournament_exporter.py", *flags])
+
+    with pytest.raises(SystemExit):
+        parse_args()
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected_max"), [("3600", 60.0), ("inf", 1.5), ("nan", 1.5)]
+)
+def test_retry_delay_bounds_server_hint(retry_after: str, expected_max: float) -> None:
+    response = _make_response({}, status_code=503)
+    response.headers = {"Retry-After": retry_after}
+
+    delay = ChallongeExporter._retry_delay(response, attempt=1)
+
+    assert 0 < delay <= expected_max
+
+
 def test_write_csv_includes_expected_headers(tmp_path: Path) -> None:
     exporter = ChallongeExporter(
         api_key="secret", community="fabco", community_id="123", year=2024
@@ -108,7 +308,9 @@ def test_write_csv_includes_expected_headers(tmp_path: Path) -> None:
     ]
     output = tmp_path / "out.csv"
 
-    exporter.write_csv(tournaments, output_path=str(output))
+    written = exporter.write_csv(iter(tournaments), output_path=str(output))
+
+    assert written == 1
 
     with output.open(newline="", encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
@@ -128,6 +330,24 @@ def test_write_csv_includes_expected_headers(tmp_path: Path) -> None:
         assert rows[0]["name"] == "Sample"
 
 
+def test_write_csv_quotes_fields_with_special_characters(tmp_path: Path) -> None:
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024
+    )
+    tournaments = [
+        {"id": "1", "name": "Plain", "participants_count": 8},
+        {"id": "2", "name": 'Armory, "Classic"\nNight', "participants_count": None},
+    ]
+    output = tmp_path / "out.csv"
+
+    exporter.write_csv(tournaments, output_path=str(output))
+
+    with output.open(newline="", encoding="utf-8") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    assert [row["name"] for row in rows] == ["Plain", 'Armory, "Classic"\nNight']
+    assert [row["participants_count"] for row in rows] == ["8", ""]
+
+
 def test_parse_date_handles_missing_timezone() -> None:
     exporter = ChallongeExporter(
         api_key="secret", community="fabco", community_id="123", year=2024
@@ -145,3 +365,61 @@ def test_load_api_key_prefers_env_file(tmp_path: Path, monkeypatch: pytest.Monke
     api_key = load_api_key(env_file=str(env_file))
 
     assert api_key == "from_env_file"
+
+
+def test_parse_date_handles_zulu_suffix() -> None:
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024
+    )
+    parsed = exporter._parse_date("2024-05-01T10:00:00.123Z")
+    assert parsed == dt.datetime(2024, 5, 1, 10, 0, 0, 123000, tzinfo=dt.timezone.utc)
+
+
+def test_read_env_all_strips_quotes_and_spacing(tmp_path: Path) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "CHALLONGE_API_KEY_OLD=stale\nCHALLONGE_API_KEY = \"quoted\"\n", encoding="utf-8"
+    )
+
+    values = _read_env_all(str(env_file))
+
+    assert values["CHALLONGE_API_KEY"] == "quoted"
+    assert values["CHALLONGE_API_KEY_OLD"] == "stale"
+    with pytest.raises(OSError):
+        _read_env_all(str(tmp_path / "missing.env"))
+
+
+def test_participants_count_reads_v2_links_meta() -> None:
+    entry = {
+        "id": "17097604",
+        "attributes": {"name": "Weekly"},
+        "relationships": {"participants": {"links": {"meta": {"count": 8}}}},
+    }
+
+    assert ChallongeExporter._participants_count(entry) == 8
+    assert ChallongeExporter._participants_count({"id": "1"}) is None
+
+
+def test_load_api_key_reads_env_file_without_dotenv(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "CHALLONGE_API_KEY=from_file\nCHALLONGE_COMMUNITY_ID=155210\n", encoding="utf-8"
+    )
+    monkeypatch.delenv("CHALLONGE_API_KEY", raising=False)
+    monkeypatch.delenv("CHALLONGE_COMMUNITY_ID", raising=False)
+    monkeypatch.setattr("tournament_exporter.load_dotenv", lambda *_: None)
+
+    assert load_api_key(env_file=str(env_file)) == "from_file"
+    assert os.environ["CHALLONGE_COMMUNITY_ID"] == "155210"
+
+
+def test_normalize_tournament_fills_missing_columns_with_none() -> None:
+    exporter = ChallongeExporter(
+        api_key="secret", community="fabco", community_id="123", year=2024
+    )
+
+    row = exporter._normalize_tournament({"id": "1", "name": "Weekly", "extra": True})
+
+    assert row == ("1", "Weekly", None, None, None, None, None, None, None, None)
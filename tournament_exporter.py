@@ -2,28 +2,160 @@
 import argparse
 import csv
 import datetime as dt
+import functools
+import math
+import operator
 import os
-from typing import Dict, Iterable, List, Optional, Tuple
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
 
 import requests
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional speedup
+
+    def _loads(response: "requests.Response") -> Dict[str, object]:
+        return response.json()
+
+else:
+
+    def _loads(response: "requests.Response") -> Dict[str, object]:
+        return orjson.loads(response.content)
+
+
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ModuleNotFoundError:  # pragma: no cover - optional speedup
+
+    def _parse_iso(raw_date: str) -> dt.datetime:
+        if raw_date.endswith("Z"):
+            return dt.datetime.fromisoformat(raw_date[:-1]).replace(tzinfo=_UTC)
+        return dt.datetime.fromisoformat(raw_date)
+
 
 BASE_URL = "https://api.challonge.com/v2"
 DEFAULT_COMMUNITY = "fabco"
 DEFAULT_TIMEOUT = 30
+DEFAULT_PER_PAGE = 200
+DEFAULT_MAX_ATTEMPTS = 3
+# Cap on a server-provided Retry-After so one response cannot stall a worker.
+MAX_RETRY_AFTER = 60.0
+# Upper bound on concurrent page requests, kept low to stay clear of 429s.
+DEFAULT_MAX_WORKERS = 3
+# Requests per second across all workers; 0 or None disables the limit.
+DEFAULT_RATE_LIMIT = 5.0
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/vnd.api+json",
+    "Authorization-Type": "v1",
+    "User-Agent": "ChallongeAnalisis tournament exporter",
+}
+# Large write buffer so big exports reach the disk in few write() calls.
+CSV_BUFFER_SIZE = 1 << 20
+CSV_FIELDS = (
+    "id",
+    "name",
+    "url",
+    "full_challonge_url",
+    "state",
+    "game_name",
+    "participants_count",
+    "created_at",
+    "started_at",
+    "completed_at",
+)
+_ROW_GETTER = operator.itemgetter(*CSV_FIELDS)
+
+_UTC = dt.timezone.utc
+_ENV_KEYS = ("CHALLONGE_API_KEY", "CHALLONGE_COMMUNITY_ID")
+# Read-only stand-in for missing payload sections; never mutated.
+_EMPTY: Mapping[str, object] = MappingProxyType({})
+_ENV_RE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+
+
+class _RateLimiter:
+    """Space requests out so at most ``rate`` start per second across threads."""
+
+    def __init__(self, rate: float) -> None:
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
 class ChallongeExporter:
     """Helper to fetch and save tournaments from Challonge."""
 
+    _DATE_FIELDS = ("started_at", "created_at")
+    _TIMESTAMP_FIELDS = ("created_at", "started_at", "completed_at", "starts_at")
+
     def __init__(
-        self, api_key: str, community: str, community_id: str, year: int
+        self,
+        api_key: str,
+        community: str,
+        community_id: str,
+        year: int,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
     ) -> None:
         self.api_key = api_key
         self.community = community
         self.community_id = community_id
         self.year = year
+        # Assumes ISO-8601 dates, whose first four characters are the year.
+        self._year_str = sys.intern(f"{year:04d}")
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers!r}")
+        self.max_workers = max_workers
+        self._limiter = _RateLimiter(rate_limit) if rate_limit else None
+        self._session = self._create_session()
+
+    def __enter__(self) -> "ChallongeExporter":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the pooled HTTP connections held by the exporter."""
+
+        close = getattr(self._session, "close", None)
+        if close is not None:
+            close()
+
+    def _create_session(self) -> "requests.Session":
+        # A shared session keeps the TLS connection alive across pages.
+        session_factory = getattr(requests, "Session", None)
+        if session_factory is None:
+            return requests
+        session = session_factory()
+        session.headers.update(DEFAULT_HEADERS)
+        session.headers["Authorization"] = self.api_key
+        # Size the pool to the page workers so concurrent fetches never have
+        # to open (and then discard) connections beyond the pooled ones.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_workers
+        )
+        session.mount("https://", adapter)
+        return session
 
     def fetch_tournaments(self) -> List[Dict[str, Optional[str]]]:
         """Fetch tournaments for the configured community and year.
@@ -31,71 +163,171 @@ class ChallongeExporter:
         Returns a list of tournament dictionaries already filtered by year.
         """
 
-        results: List[Dict[str, Optional[str]]] = []
+        return list(self.iter_tournaments())
+
+    def iter_tournaments(self) -> Iterator[Dict[str, Optional[str]]]:
+        """Yield tournaments for the configured community and year page by page.
+
+        Once the first page reports ``meta.total_pages`` the remaining pages are
+        requested concurrently; otherwise ``next`` links are followed in order,
+        with the following page prefetched while the current one is processed.
+        """
+
         url = f"{BASE_URL}/communities/{self.community_id}/tournaments"
         page = 1
-        params = {
-            "api_key": self.api_key,
-            "state": "all",
-            "per_page": 200,
-        }
-
-        while url:
-            params["page"] = page
-            response = requests.get(url, params=params, timeout=DEFAULT_TIMEOUT)
-            response.raise_for_status()
-            payload = response.json()
-
-            data = payload.get("data", []) or []
-            for entry in data:
-                attributes = self._extract_attributes(entry)
-                if not attributes or not self._is_in_year(attributes):
-                    continue
-                results.append(self._normalize_tournament(attributes))
-
-            next_url, page = self._next_page(payload, current_page=page)
-            if next_url:
-                url = next_url
-                params = {"api_key": self.api_key}
-            else:
+        # Encode the fixed query once; each request only appends its page.
+        query = urlencode(
+            {"api_key": self.api_key, "state": "all", "per_page": DEFAULT_PER_PAGE}
+        )
+        link_query = urlencode({"api_key": self.api_key})
+
+        payload = self._get_page(url, f"{query}&page={page}")
+
+        total_pages = self._total_pages(payload)
+        if total_pages > 1:
+            page_params = [f"{query}&page={number}" for number in range(2, total_pages + 1)]
+            workers = min(self.max_workers, len(page_params))
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                # map() submits every page up front and yields in submission
+                # order, keeping the output stable.
+                pages = executor.map(functools.partial(self._get_page, url), page_params)
+                yield from self._filter_page(payload)
+                for payload in pages:
+                    yield from self._filter_page(payload)
+            finally:
+                # If the consumer stops early, drop queued pages instead of
+                # downloading the rest of the community first.
+                executor.shutdown(wait=False, cancel_futures=True)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while payload is not None:
+                next_url, page = self._next_page(payload, current_page=page)
+                prefetch = None
+                if next_url:
+                    prefetch = executor.submit(
+                        self._get_page, next_url, f"{link_query}&page={page}"
+                    )
+                yield from self._filter_page(payload)
+                payload = prefetch.result() if prefetch else None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_page(self, url: str, params: str) -> Mapping[str, object]:
+        response = self._get_with_retry(url, params)
+        # An empty page ends the export, so there is no need to decode it. Only
+        # the top-level key counts; relationships nest their own "data":[].
+        if response.content.startswith(b'{"data":[]'):
+            return _EMPTY
+        return _loads(response)
+
+    def _get_with_retry(self, url: str, params: str) -> "requests.Response":
+        for attempt in range(1, DEFAULT_MAX_ATTEMPTS + 1):
+            if self._limiter is not None:
+                self._limiter.acquire()
+            response = self._session.get(url, params=params, timeout=DEFAULT_TIMEOUT)
+            status = response.status_code
+            if attempt == DEFAULT_MAX_ATTEMPTS or (status != 429 and status < 500):
                 break
-
+            time.sleep(self._retry_delay(response, attempt))
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _retry_delay(response: "requests.Response", attempt: int) -> float:
+        # Prefer the server's hint; otherwise back off exponentially with jitter
+        # so concurrent page requests do not retry in lockstep.
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except (AttributeError, TypeError, ValueError):
+            retry_after = math.nan
+        if math.isfinite(retry_after):
+            return min(max(0.0, retry_after), MAX_RETRY_AFTER)
+        return min(2 ** (attempt - 1), 5) * (0.5 + random.random())
+
+    def _filter_page(self, payload: Dict[str, object]) -> List[Dict[str, Optional[str]]]:
+        results: List[Dict[str, Optional[str]]] = []
+        data = payload.get("data") or ()
+        # Bind the per-entry helpers once; this loop runs for every tournament.
+        append = results.append
+        merge_timestamps = self._merge_timestamps
+        is_in_year = self._is_in_year
+        participants_count = self._participants_count
+        for entry in data:
+            # Entries without an attributes object are malformed; skip them up
+            # front so the rest of the loop can treat fields as typed.
+            attributes = entry.get("attributes")
+            if not isinstance(attributes, dict):
+                continue
+            merge_timestamps(attributes)
+            if not is_in_year(attributes):
+                continue
+            # The page payload is discarded after parsing, so the entry's own
+            # attributes dict is updated in place rather than copied.
+            attributes.setdefault("id", entry.get("id"))
+            if attributes.get("participants_count") is None:
+                attributes["participants_count"] = participants_count(entry)
+            append(attributes)
         return results
 
-    def _extract_attributes(self, entry: Dict[str, object]) -> Dict[str, Optional[str]]:
-        attributes = dict(entry.get("attributes", {}) or {})
-        attributes.setdefault("id", entry.get("id"))
-        relationships = entry.get("relationships", {}) or {}
-
-        participants = relationships.get("participants", {}) or {}
-        if not attributes.get("participants_count"):
-            attributes["participants_count"] = participants.get("count")
-
-        return attributes
+    @staticmethod
+    def _total_pages(payload: Dict[str, object]) -> int:
+        meta = payload.get("meta") or _EMPTY
+        total_pages = meta.get("total_pages")
+        return total_pages if isinstance(total_pages, int) else 0
+
+    @staticmethod
+    def _merge_timestamps(attributes: Dict[str, object]) -> None:
+        # v2 nests the dates under ``attributes.timestamps``; lift them to the
+        # top level where the year filter and CSV columns expect them.
+        timestamps = attributes.get("timestamps")
+        if not isinstance(timestamps, dict):
+            return
+        for key in ChallongeExporter._TIMESTAMP_FIELDS:
+            value = timestamps.get(key)
+            if value and not attributes.get(key):
+                attributes[key] = value
+
+    @staticmethod
+    def _participants_count(entry: Dict[str, object]) -> Optional[int]:
+        relationships = entry.get("relationships") or _EMPTY
+        participants = relationships.get("participants")
+        if not isinstance(participants, dict):
+            return None
+        count = participants.get("count")
+        if count is None:
+            # v2 reports the count under the relationship links.
+            links = participants.get("links") or _EMPTY
+            meta = participants.get("meta") or links.get("meta")
+            count = meta.get("count") if isinstance(meta, dict) else None
+        return count
 
     def _is_in_year(self, tournament: Dict[str, Optional[str]]) -> bool:
-        date_fields = ["started_at", "created_at"]
-        for field in date_fields:
+        for field in ChallongeExporter._DATE_FIELDS:
             raw_date = tournament.get(field)
             if not raw_date:
                 continue
+            # ISO-8601 timestamps lead with the year, so skip the full parse.
+            prefix = raw_date[:4]
+            if prefix == self._year_str:
+                return True
+            if prefix.isdigit():
+                continue
             parsed = self._parse_date(raw_date)
             if parsed and parsed.year == self.year:
                 return True
         return False
 
     def _parse_date(self, raw_date: str) -> Optional[dt.datetime]:
-        try:
-            sanitized = raw_date.replace("Z", "+00:00")
-            return dt.datetime.fromisoformat(sanitized)
-        except ValueError:
-            return None
+        return _parse_iso_date(raw_date)
 
     def _next_page(
         self, payload: Dict[str, object], current_page: int
     ) -> Tuple[Optional[str], int]:
-        links = payload.get("links", {}) or {}
-        meta = payload.get("meta", {}) or {}
+        links = payload.get("links") or _EMPTY
+        meta = payload.get("meta") or _EMPTY
 
         if links.get("next"):
             return links["next"], current_page + 1
@@ -113,38 +345,51 @@ class ChallongeExporter:
 
         return None, current_page
 
-    def _normalize_tournament(self, tournament: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
-        return {
-            "id": tournament.get("id"),
-            "name": tournament.get("name"),
-            "url": tournament.get("url"),
-            "full_challonge_url": tournament.get("full_challonge_url"),
-            "state": tournament.get("state"),
-            "game_name": tournament.get("game_name"),
-            "participants_count": tournament.get("participants_count"),
-            "created_at": tournament.get("created_at"),
-            "started_at": tournament.get("started_at"),
-            "completed_at": tournament.get("completed_at"),
-        }
-
-    def write_csv(self, tournaments: Iterable[Dict[str, Optional[str]]], output_path: str) -> None:
-        fieldnames = [
-            "id",
-            "name",
-            "url",
-            "full_challonge_url",
-            "state",
-            "game_name",
-            "participants_count",
-            "created_at",
-            "started_at",
-            "completed_at",
-        ]
-        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+    def _normalize_tournament(self, tournament: Dict[str, Optional[str]]) -> Tuple[object, ...]:
+        """Project a tournament onto a CSV row in ``CSV_FIELDS`` order."""
+
+        try:
+            # One C-level call when the tournament carries every column.
+            return _ROW_GETTER(tournament)
+        except KeyError:
+            return tuple([tournament.get(field) for field in CSV_FIELDS])
+
+    def write_csv(self, tournaments: Iterable[Dict[str, Optional[str]]], output_path: str) -> int:
+        """Write tournaments to ``output_path`` and return how many rows were written.
+
+        ``tournaments`` may be a generator; rows are written as they arrive.
+        """
+
+        written = 0
+        with open(
+            output_path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE
+        ) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_FIELDS)
+            write = csvfile.write
             for tournament in tournaments:
-                writer.writerow(tournament)
+                row = self._normalize_tournament(tournament)
+                line = _fast_csv_line(row)
+                if line is None:
+                    writer.writerow(row)
+                else:
+                    write(line)
+                written += 1
+        return written
+
+
+def _positive_int(raw: str) -> int:
+    value = int(raw)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {raw}")
+    return value
+
+
+def _non_negative_float(raw: str) -> float:
+    value = float(raw)
+    if not math.isfinite(value) or value < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative number, got {raw}")
+    return value
 
 
 def parse_args() -> argparse.Namespace:
@@ -178,8 +423,11 @@ def parse_args() -> argparse.Namespace:
         "--year",
         "-y",
         type=int,
-        default=dt.date.today().year,
-        help="Year to filter tournaments by (based on start or creation date).",
+        default=None,
+        help=(
+            "Year to filter tournaments by (based on start or creation date). "
+            "Defaults to the current year."
+        ),
     )
     parser.add_argument(
         "--output",
@@ -187,6 +435,21 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Path to write CSV output (defaults to tournaments_<community>_<year>.csv)",
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=_positive_int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum page requests in flight at once (defaults to {DEFAULT_MAX_WORKERS}).",
+    )
+    parser.add_argument(
+        "--rate-limit-rps",
+        type=_non_negative_float,
+        default=DEFAULT_RATE_LIMIT,
+        help=(
+            "Maximum requests per second sent to Challonge; 0 disables the limit "
+            f"(defaults to {DEFAULT_RATE_LIMIT:g})."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -200,17 +463,18 @@ def main() -> None:
             "CHALLONGE_COMMUNITY_ID is required. Provide --community-id or set it in the env."
         )
 
-    output_path = args.output or f"tournaments_{args.community}_{args.year}.csv"
-    exporter = ChallongeExporter(
+    year = args.year if args.year is not None else dt.date.today().year
+    output_path = args.output or f"tournaments_{args.community}_{year}.csv"
+    with ChallongeExporter(
         api_key=api_key,
         community=args.community,
         community_id=community_id,
-        year=args.year,
-    )
-
-    tournaments = exporter.fetch_tournaments()
-    exporter.write_csv(tournaments, output_path)
-    print(f"Exported {len(tournaments)} tournaments to {output_path}")
+        year=year,
+        max_workers=args.max_concurrency,
+        rate_limit=args.rate_limit_rps,
+    ) as exporter:
+        exported = exporter.write_csv(exporter.iter_tournaments(), output_path)
+    print(f"Exported {exported} tournaments to {output_path}")
 
 
 def load_api_key(env_file: str = ".env") -> str:
@@ -218,10 +482,16 @@ def load_api_key(env_file: str = ".env") -> str:
 
     if env_file:
         load_dotenv(env_file)
-        if not os.getenv("CHALLONGE_API_KEY") and os.path.exists(env_file):
-            api_key_from_file = _read_key_from_file(env_file)
-            if api_key_from_file:
-                os.environ["CHALLONGE_API_KEY"] = api_key_from_file
+        missing = [key for key in _ENV_KEYS if not os.getenv(key)]
+        if missing:
+            # One read of the file covers every key dotenv did not provide.
+            try:
+                env_values = _read_env_all(env_file)
+            except OSError:
+                env_values = {}
+            for key in missing:
+                if env_values.get(key):
+                    os.environ[key] = env_values[key]
 
     api_key = os.getenv("CHALLONGE_API_KEY")
     if not api_key:
@@ -231,18 +501,42 @@ def load_api_key(env_file: str = ".env") -> str:
     return api_key
 
 
-def _read_key_from_file(env_file: str) -> Optional[str]:
-    """Lightweight parser to extract CHALLONGE_API_KEY when dotenv is unavailable."""
+@functools.lru_cache(maxsize=4)
+def _read_env_all(env_file: str) -> Dict[str, str]:
+    """Parse every ``KEY=value`` line of an env file in a single regex scan."""
+
+    with open(env_file, encoding="utf-8") as handle:
+        text = handle.read()
+    return {key: value.strip('"').strip("'") for key, value in _ENV_RE.findall(text)}
+
+
+def _fast_csv_line(row: Iterable[object]) -> Optional[str]:
+    """Join a row without quoting, or return None if any field needs csv quoting.
+
+    Challonge values are mostly ids, slugs, URLs and timestamps, so most rows
+    take this path and only the rest go through ``csv.writer``.
+    """
+
+    fields = []
+    for value in row:
+        if value is None:
+            fields.append("")
+            continue
+        text = value if isinstance(value, str) else str(value)
+        if "," in text or '"' in text or "\n" in text or "\r" in text:
+            return None
+        fields.append(text)
+    return ",".join(fields) + "\r\n"
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_date(raw_date: str) -> Optional[dt.datetime]:
+    """Parse an ISO-8601 timestamp, memoized since exports repeat many dates."""
 
     try:
-        with open(env_file, encoding="utf-8") as handle:
-            for line in handle:
-                if line.strip().startswith("CHALLONGE_API_KEY"):
-                    _, _, value = line.partition("=")
-                    return value.strip().strip('"').strip("'")
-    except OSError:
+        return _parse_iso(raw_date)
+    except ValueError:
         return None
-    return None
 
 
 if __name__ == "__main__":